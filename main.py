@@ -1,15 +1,25 @@
 """
 MySQL MCP Server (FastMCP)
-Provides list_databases, list_tables, and run_query tools.
+Provides list_databases, list_tables, run_query, and refresh_schema_cache tools.
 Supports stdio (Claude Desktop) and streamable-http/sse (Cursor, etc.).
 """
 import os
-import json
+import asyncio
+import concurrent.futures
+import hashlib
 import logging
+import queue
+import re
 import ssl
+import threading
+import time
+from collections import OrderedDict
 from urllib.parse import urlparse, unquote, parse_qs
 from dotenv import load_dotenv
+import anyio
+import orjson
 import pymysql
+from pymysql.constants import CLIENT, FIELD_TYPE
 from mcp.server.fastmcp import FastMCP
 
 load_dotenv()
@@ -19,13 +29,108 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
 )
 logger = logging.getLogger("mysql-mcp")
+# The level is fixed at startup; per-call debug logging checks this instead of building
+# log arguments that would be thrown away.
+_DEBUG = logger.isEnabledFor(logging.DEBUG)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 BIND_HOST = os.getenv("BIND_HOST", "0.0.0.0")
 BIND_PORT = int(os.getenv("PORT", "8002"))
 MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
+# Compact JSON is smaller and tokenizes the same for LLM clients; indent only on request.
+PRETTY_JSON = os.getenv("PRETTY_JSON", "").lower() in ("1", "true", "yes")
+PRETTY_JSON_MAX_BYTES = int(os.getenv("PRETTY_JSON_MAX_BYTES", "65536"))
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "4"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "16"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+# list_databases/list_tables results are cached this many seconds; set 0 if DDL happens at runtime.
+SCHEMA_CACHE_TTL = float(os.getenv("SCHEMA_CACHE_TTL", "60"))
+# Identical run_query result sets are reused for this many seconds (0 disables).
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "10"))
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "128"))
+# Larger results are not cached, so a few huge result sets can't pin memory for the TTL.
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", "1048576"))
+# Concurrent SELECTs are coalesced into multi-statement round trips of up to this many
+# queries (1 disables batching), waiting at most QUERY_BATCH_WINDOW_MS for a batch to fill.
+QUERY_BATCH_SIZE = int(os.getenv("QUERY_BATCH_SIZE", "1"))
+QUERY_BATCH_WINDOW_MS = float(os.getenv("QUERY_BATCH_WINDOW_MS", "2"))
 
-mcp = FastMCP(
+# Idle connections older than this are pinged before reuse (MySQL wait_timeout drops).
+_POOL_PING_AFTER = 30
+
+# Decimal and temporal columns are kept as the server's text instead of being parsed into
+# Python objects, so the serializer never needs a per-value str() fallback for them.
+# Values therefore keep the server's own format rather than Python's str(): fractional
+# seconds have the column's precision ("00.500" for DATETIME(3), "00.000000" for a zero
+# DATETIME(6) fraction), and TIME values can exceed 24h or be negative.
+_CONVERSIONS = dict(pymysql.converters.conversions)
+for _field_type in (
+    FIELD_TYPE.DECIMAL,
+    FIELD_TYPE.NEWDECIMAL,
+    FIELD_TYPE.DATE,
+    FIELD_TYPE.DATETIME,
+    FIELD_TYPE.TIMESTAMP,
+    FIELD_TYPE.TIME,
+):
+    _CONVERSIONS[_field_type] = pymysql.converters.through
+
+# System schemas hidden from list_databases/list_tables.
+_EXCLUDE_SQL = "('information_schema', 'performance_schema', 'mysql', 'sys')"
+_LIST_DATABASES_SQL = (
+    "SELECT schema_name FROM information_schema.schemata "
+    "WHERE schema_name NOT IN " + _EXCLUDE_SQL + " ORDER BY schema_name"
+)
+_LIST_TABLES_SQL = (
+    "SELECT table_schema, table_name FROM information_schema.tables "
+    "WHERE table_schema NOT IN " + _EXCLUDE_SQL + " ORDER BY table_schema, table_name"
+)
+# Server-side prepared statement name -> SQL, prepared once per pooled connection.
+_PREPARED_LISTINGS = {
+    "list_dbs": _LIST_DATABASES_SQL,
+    "list_tbls": _LIST_TABLES_SQL,
+}
+
+_BATCHABLE_QUERY = re.compile(r"\s*\(*\s*select\b", re.IGNORECASE)
+# Queries that return a result set but can still leave session state (user variable
+# assignments, named locks, procedure side effects) behind for the next borrower.
+_SESSION_STATE_QUERY = re.compile(r":=|\bINTO\s+@|\bGET_LOCK\s*\(|\bCALL\b", re.IGNORECASE)
+
+# Rows fetched per round of run_query's streaming serializer.
+_STREAM_CHUNK_ROWS = 1000
+
+_POOL = queue.LifoQueue(maxsize=DB_POOL_MAX_SIZE)
+_POOL_SLOTS = threading.BoundedSemaphore(DB_POOL_MAX_SIZE)
+# Blocking DB work runs here; one worker per pool slot, so threads never queue on the pool.
+_DB_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=DB_POOL_MAX_SIZE, thread_name_prefix="mysql-db"
+)
+
+# key -> (expires_at, value) for near-static information_schema listings.
+_SCHEMA_CACHE = {}
+# query hash -> (expires_at, result JSON), least recently used first.
+_QUERY_CACHE = OrderedDict()
+
+
+class _MySQLMCP(FastMCP):
+    """FastMCP that builds the tools/list descriptors once instead of on every request."""
+
+    _tools_desc = None
+
+    async def list_tools(self):
+        if self._tools_desc is None:
+            self._tools_desc = await super().list_tools()
+        return self._tools_desc
+
+    def add_tool(self, *args, **kwargs):
+        self._tools_desc = None
+        return super().add_tool(*args, **kwargs)
+
+    def remove_tool(self, *args, **kwargs):
+        self._tools_desc = None
+        return super().remove_tool(*args, **kwargs)
+
+
+mcp = _MySQLMCP(
     "mysql-mcp",
     host=BIND_HOST,
     port=BIND_PORT,
@@ -33,6 +138,18 @@ mcp = FastMCP(
 )
 
 
+# One SSL context (trust store, OpenSSL SSL_CTX) shared by every pooled connection.
+_SSL_CTX = None
+
+
+def _ssl_context():
+    """Return the shared client SSL context, creating it on first use."""
+    global _SSL_CTX
+    if _SSL_CTX is None:
+        _SSL_CTX = ssl.create_default_context()
+    return _SSL_CTX
+
+
 def _parse_database_url(url):
     """Parse MySQL DATABASE_URL into connection kwargs (supports PlanetScale SSL)."""
     logger.debug("Parsing DATABASE_URL (host/user/database only)")
@@ -56,84 +173,439 @@ def _parse_database_url(url):
     }
     qs = parse_qs(parsed.query)
     if "ssl_mode" in qs or "sslaccept" in qs or (host and "psdb.cloud" in host):
-        kwargs["ssl"] = ssl.create_default_context()
+        kwargs["ssl"] = _ssl_context()
         logger.debug("SSL enabled for connection")
     logger.debug("Parsed connection: host=%s port=%s user=%s database=%s", kwargs["host"], kwargs["port"], kwargs["user"], kwargs["database"])
     return kwargs
 
 
-def get_connection():
-    """Create a read-only MySQL connection (best-effort read-only on PlanetScale/Vitess)."""
+# DATABASE_URL is fixed for the process, so parse it only once.
+_CONN_KWARGS = _parse_database_url(DATABASE_URL) if DATABASE_URL else None
+
+
+def _finish_json(data):
+    """Decode compact JSON bytes, indenting them if PRETTY_JSON is set and they are small.
+
+    Payloads over PRETTY_JSON_MAX_BYTES stay compact: indentation would add 20-30% to the
+    largest responses, where encode time and transfer size matter most.
+    """
+    if PRETTY_JSON and len(data) <= PRETTY_JSON_MAX_BYTES:
+        data = orjson.dumps(orjson.loads(data), option=orjson.OPT_INDENT_2)
+    return data.decode()
+
+
+def _dumps(obj):
+    """Serialize a tool result to JSON text."""
+    return _finish_json(orjson.dumps(obj, default=str))
+
+
+def _dump_result_set(columns, cur):
+    """Stream an unbuffered cursor into the same JSON as _dumps({"columns": ..., "rows": ...}).
+
+    Rows are encoded in chunks straight into one buffer, so the full row list is never held
+    in memory next to its JSON. Returns (json_text, row_count).
+    """
+    buf = bytearray(b'{"columns":')
+    buf += orjson.dumps(columns)
+    buf += b',"rows":['
+    row_count = 0
+    while True:
+        rows = cur.fetchmany(_STREAM_CHUNK_ROWS)
+        if not rows:
+            break
+        if row_count:
+            buf += b","
+        # Drop the chunk's own brackets so its rows join the enclosing array.
+        buf += orjson.dumps(rows, default=str)[1:-1]
+        row_count += len(rows)
+    buf += b"]}"
+    return _finish_json(buf), row_count
+
+
+def _open_connection():
+    """Open a new read-only MySQL connection (best-effort read-only on PlanetScale/Vitess)."""
     logger.debug("Creating MySQL connection")
-    kwargs = _parse_database_url(DATABASE_URL)
-    conn = pymysql.connect(**kwargs)
+    if _CONN_KWARGS is None:
+        raise RuntimeError("DATABASE_URL is not set")
+    conn = pymysql.connect(
+        **_CONN_KWARGS,
+        autocommit=True,
+        conv=_CONVERSIONS,
+        cursorclass=pymysql.cursors.SSCursor,
+        client_flag=CLIENT.MULTI_STATEMENTS if QUERY_BATCH_SIZE > 1 else 0,
+    )
+    # One cursor lives as long as the connection and is reused by every borrower.
+    cur = conn._shared_cursor = conn.cursor()
     try:
-        with conn.cursor() as cur:
-            cur.execute("SET SESSION transaction_read_only = 1")
+        cur.execute("SET SESSION transaction_read_only = 1")
         logger.debug("Connection established, read-only session set")
     except Exception as e:
         logger.debug("Could not set read-only session (ignored): %s", e)
+    try:
+        for name, sql in _PREPARED_LISTINGS.items():
+            cur.execute("PREPARE " + name + " FROM %s", (sql,))
+        conn._listings_prepared = True
+    except Exception as e:
+        # Vitess/PlanetScale may not support PREPARE; the listings fall back to plain SQL.
+        logger.debug("Could not prepare listing statements (ignored): %s", e)
+        conn._listings_prepared = False
+    conn._pool_created_at = conn._pool_idle_since = time.monotonic()
     return conn
 
 
-@mcp.tool(description="List all databases in MySQL.")
-def list_databases() -> str:
-    """List all databases in MySQL."""
-    logger.debug("list_databases called")
-    conn = get_connection()
+def _close_quietly(conn):
+    # The shared cursor holds no server-side state, and closing it would try to drain any
+    # unread rows from a connection that is being dropped, so only the socket is closed.
     try:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT schema_name FROM information_schema.schemata "
-                "WHERE schema_name NOT IN ('information_schema', 'performance_schema', 'mysql', 'sys') "
-                "ORDER BY schema_name"
-            )
-            databases = [row[0] for row in cur.fetchall()]
-        logger.debug("list_databases returned %d databases: %s", len(databases), databases)
-        return json.dumps(databases, indent=2)
-    finally:
         conn.close()
+    except Exception:
+        pass
 
 
-@mcp.tool(description="List all tables in the database (schema and table name).")
-def list_tables() -> str:
-    """List all tables in the database."""
-    logger.debug("list_tables called")
-    conn = get_connection()
+def get_connection():
+    """Borrow a read-only MySQL connection from the pool, opening one if none is idle.
+
+    Returns (conn, cursor); the cursor is the connection's long-lived shared cursor.
+    """
+    _POOL_SLOTS.acquire()
+    try:
+        while True:
+            try:
+                conn = _POOL.get_nowait()
+            except queue.Empty:
+                conn = _open_connection()
+                return conn, conn._shared_cursor
+            now = time.monotonic()
+            if now - conn._pool_created_at > DB_POOL_RECYCLE:
+                logger.debug("Recycling pooled connection past DB_POOL_RECYCLE")
+                _close_quietly(conn)
+                continue
+            if now - conn._pool_idle_since > _POOL_PING_AFTER:
+                try:
+                    # No reconnect: a silent reconnect would drop the read-only session setting.
+                    conn.ping(reconnect=False)
+                except Exception as e:
+                    logger.debug("Dropping stale pooled connection: %s", e)
+                    _close_quietly(conn)
+                    continue
+            return conn, conn._shared_cursor
+    except BaseException:
+        _POOL_SLOTS.release()
+        raise
+
+
+def release_connection(conn, discard=False):
+    """Return a connection to the pool, or close it if discarded, broken, or the pool is full."""
     try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT table_schema, table_name
-                FROM information_schema.tables
-                WHERE table_schema NOT IN ('information_schema', 'performance_schema', 'mysql', 'sys')
-                ORDER BY table_schema, table_name
-            """)
-            tables = [{"schema": row[0], "table": row[1]} for row in cur.fetchall()]
-        logger.debug("list_tables returned %d tables", len(tables))
-        return json.dumps(tables, indent=2)
+        if discard or not conn.open:
+            _close_quietly(conn)
+            return
+        try:
+            # Skip any trailing result sets (e.g. CALL's final OK) so the next borrower
+            # starts on a clean cursor.
+            while conn._shared_cursor.nextset():
+                pass
+        except Exception as e:
+            logger.debug("Dropping connection that could not be reset: %s", e)
+            _close_quietly(conn)
+            return
+        conn._pool_idle_since = time.monotonic()
+        try:
+            _POOL.put_nowait(conn)
+        except queue.Full:
+            _close_quietly(conn)
     finally:
-        conn.close()
+        _POOL_SLOTS.release()
 
 
-@mcp.tool(description="Run a read-only SQL query on MySQL. Returns columns and rows or a message.")
-def run_query(query: str) -> str:
-    """Run a read-only SQL query and return results."""
-    logger.debug("run_query called: %s", query[:200] + "..." if len(query) > 200 else query)
-    conn = get_connection()
+def warm_pool():
+    """Pre-open DB_POOL_MIN_SIZE connections so the first tool calls skip the handshake."""
+    conns = []
     try:
-        with conn.cursor() as cur:
-            cur.execute(query)
-            if cur.description:
-                columns = [desc[0] for desc in cur.description]
-                rows = cur.fetchall()
-                logger.debug("run_query returned %d rows, %d columns", len(rows), len(columns))
-                result = {"columns": columns, "rows": [list(row) for row in rows]}
-            else:
-                logger.debug("run_query executed (no result set)")
-                result = {"message": "Query executed (read-only mode)"}
-        return json.dumps(result, indent=2, default=str)
+        for _ in range(min(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE)):
+            conns.append(get_connection()[0])
+    except Exception as e:
+        logger.warning("Could not pre-open pooled connections: %s", e)
+    for conn in conns:
+        release_connection(conn)
+    logger.debug("Connection pool warmed with %d connections", len(conns))
+
+
+def _query_databases():
+    conn, cur = get_connection()
+    try:
+        cur.execute("EXECUTE list_dbs" if conn._listings_prepared else _LIST_DATABASES_SQL)
+        databases = [row[0] for row in cur.fetchall()]
+        if _DEBUG:
+            logger.debug("list_databases returned %d databases: %s", len(databases), databases)
+        return _dumps(databases)
     finally:
-        conn.close()
+        release_connection(conn)
+
+
+def _query_tables():
+    conn, cur = get_connection()
+    try:
+        cur.execute("EXECUTE list_tbls" if conn._listings_prepared else _LIST_TABLES_SQL)
+        tables = [{"schema": row[0], "table": row[1]} for row in cur.fetchall()]
+        if _DEBUG:
+            logger.debug("list_tables returned %d tables", len(tables))
+        return _dumps(tables)
+    finally:
+        release_connection(conn)
+
+
+def _read_result(cur):
+    """Serialize the cursor's current result; returns (result JSON, whether it was a result set)."""
+    if cur.description:
+        columns = [desc[0] for desc in cur.description]
+        text, row_count = _dump_result_set(columns, cur)
+        if _DEBUG:
+            logger.debug("run_query returned %d rows, %d columns", row_count, len(columns))
+        return text, True
+    if _DEBUG:
+        logger.debug("run_query executed (no result set)")
+    return _dumps({"message": "Query executed (read-only mode)"}), False
+
+
+def _unbuffered_active(conn):
+    """Whether conn still has unread rows of an unbuffered (SSCursor) result set."""
+    result = conn._result
+    return result is not None and result.unbuffered_active
+
+
+def _execute_query(query):
+    """Run query on a pooled connection; returns (result JSON, whether it produced a result set)."""
+    conn, cur = get_connection()
+    # Statements without a result set (SET, BEGIN, ...) or matching _SESSION_STATE_QUERY
+    # may have changed session state, so don't hand this connection to the next caller.
+    discard = _SESSION_STATE_QUERY.search(query) is not None
+    try:
+        cur.execute(query)
+        result = _read_result(cur)
+        discard = discard or not result[1]
+        return result
+    except pymysql.MySQLError as e:
+        # Server errors such as a syntax error or unknown table are raised by execute()
+        # before any rows are streamed, and leave the connection usable. Drop it only if
+        # the link itself failed or an unbuffered result was left half-read.
+        discard = discard or isinstance(e, pymysql.OperationalError) or _unbuffered_active(conn)
+        raise
+    except BaseException:
+        # Anything else may have interrupted the protocol mid-packet.
+        discard = True
+        raise
+    finally:
+        release_connection(conn, discard)
+
+
+def _execute_batch(queries):
+    """Run queries in one multi-statement round trip; returns a result or exception per query."""
+    results = []
+    conn, cur = get_connection()
+    discard = False
+    try:
+        try:
+            # Newline before each ";" so a trailing "-- comment" can't swallow the separator.
+            cur.execute("\n;\n".join(queries))
+            results.append(_read_result(cur))
+            while len(results) < len(queries) and cur.nextset():
+                results.append(_read_result(cur))
+            if len(results) < len(queries):
+                # An unterminated comment or string in one query swallowed a separator, so
+                # no result can be trusted to belong to its query; all are retried alone.
+                results = []
+                discard = True
+        except pymysql.MySQLError:
+            # The same mis-split could shift an error onto the wrong query, so every query
+            # is retried alone and reports its own result or error.
+            results = []
+            discard = True
+        discard = (
+            discard
+            or not all(r[1] for r in results)
+            or any(_SESSION_STATE_QUERY.search(query) for query in queries)
+        )
+    except BaseException:
+        discard = True
+        raise
+    finally:
+        release_connection(conn, discard)
+    for query in queries[len(results):]:
+        try:
+            results.append(_execute_query(query))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+async def _run_db(fn, *args):
+    """Run blocking DB work on _DB_EXECUTOR without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_DB_EXECUTOR, fn, *args)
+
+
+class _QueryBatcher:
+    """Coalesces concurrent run_query SELECTs into multi-statement round trips.
+
+    One dispatcher task drains the queue into batches of up to QUERY_BATCH_SIZE queries,
+    waiting at most QUERY_BATCH_WINDOW_MS for a batch to fill, and hands each batch to a
+    worker thread without waiting for it, so batches still run in parallel on the pool.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self._queue = asyncio.Queue()
+        self._running = set()
+        self._dispatcher = loop.create_task(self._dispatch())
+
+    async def submit(self, query):
+        future = self.loop.create_future()
+        self._queue.put_nowait((query, future))
+        return await future
+
+    async def _dispatch(self):
+        window = QUERY_BATCH_WINDOW_MS / 1000
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self.loop.time() + window
+            while len(batch) < QUERY_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = self.loop.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch):
+        if _DEBUG:
+            logger.debug("Running batch of %d queries", len(batch))
+        queries = [query for query, _ in batch]
+        try:
+            if len(queries) == 1:
+                results = [await _run_db(_execute_query, queries[0])]
+            else:
+                results = await _run_db(_execute_batch, queries)
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+_BATCHER = None
+
+
+def _get_batcher():
+    global _BATCHER
+    loop = asyncio.get_running_loop()
+    if _BATCHER is None or _BATCHER.loop is not loop:
+        _BATCHER = _QueryBatcher(loop)
+    return _BATCHER
+
+
+async def _cached(key, ttl, fn):
+    """Return fn()'s result from _SCHEMA_CACHE, running it on _DB_EXECUTOR on a miss."""
+    entry = _SCHEMA_CACHE.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        if _DEBUG:
+            logger.debug("Schema cache hit: %s", key)
+        return entry[1]
+    value = await _run_db(fn)
+    if ttl > 0:
+        _SCHEMA_CACHE[key] = (time.monotonic() + ttl, value)
+    return value
+
+
+def _query_cache_key(query):
+    # Only surrounding whitespace is normalized: case and inner spacing can be significant
+    # inside string literals.
+    return hashlib.blake2b(query.strip().encode(), digest_size=16).digest()
+
+
+# pymysql is blocking, so tools run the DB work on _DB_EXECUTOR to keep the event loop
+# (and every other stdio/HTTP session) responsive while a query is in flight.
+@mcp.tool(description="List all databases in MySQL.")
+async def list_databases() -> str:
+    """List all databases in MySQL."""
+    if _DEBUG:
+        logger.debug("list_databases called")
+    return await _cached("dbs", SCHEMA_CACHE_TTL, _query_databases)
+
+
+@mcp.tool(description="List all tables in the database (schema and table name).")
+async def list_tables() -> str:
+    """List all tables in the database."""
+    if _DEBUG:
+        logger.debug("list_tables called")
+    return await _cached("tables", SCHEMA_CACHE_TTL, _query_tables)
+
+
+@mcp.tool(description="Clear the cached list_databases/list_tables results (e.g. after schema changes).")
+async def refresh_schema_cache() -> str:
+    """Clear the cached database and table listings."""
+    if _DEBUG:
+        logger.debug("refresh_schema_cache called")
+    _SCHEMA_CACHE.clear()
+    return "Schema cache cleared"
+
+
+@mcp.tool(
+    description="Run a read-only SQL query on MySQL. Returns columns and rows or a message. "
+    "Identical queries may be answered from a short-lived cache; pass no_cache=true for fresh results."
+)
+async def run_query(query: str, no_cache: bool = False) -> str:
+    """Run a read-only SQL query and return results."""
+    if _DEBUG:
+        logger.debug("run_query called: %s", query[:200] + "..." if len(query) > 200 else query)
+    key = _query_cache_key(query)
+    if not no_cache:
+        entry = _QUERY_CACHE.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            if _DEBUG:
+                logger.debug("run_query cache hit")
+            _QUERY_CACHE.move_to_end(key)
+            return entry[1]
+    if QUERY_BATCH_SIZE <= 1:
+        result, has_result_set = await _run_db(_execute_query, query)
+    else:
+        statement = query.strip().rstrip(";").rstrip()
+        if ";" in statement:
+            # Connections accept multi-statements while batching is on; never let one query
+            # chain statements (e.g. switch off transaction_read_only and then write).
+            raise ValueError("Multi-statement queries are not allowed when QUERY_BATCH_SIZE > 1")
+        # Session-changing SELECTs run alone: in a batch they'd share one session with
+        # other callers' queries.
+        if _BATCHABLE_QUERY.match(statement) and not _SESSION_STATE_QUERY.search(statement):
+            result, has_result_set = await _get_batcher().submit(statement)
+        else:
+            result, has_result_set = await _run_db(_execute_query, statement)
+    if (
+        has_result_set
+        # Replaying e.g. GET_LOCK() or @x := ... from cache would skip its side effect.
+        and not _SESSION_STATE_QUERY.search(query)
+        and QUERY_CACHE_TTL > 0
+        and QUERY_CACHE_SIZE > 0
+        # JSON text length; results are mostly ASCII, so this is close to the byte size.
+        and len(result) <= QUERY_CACHE_MAX_BYTES
+    ):
+        _QUERY_CACHE[key] = (time.monotonic() + QUERY_CACHE_TTL, result)
+        _QUERY_CACHE.move_to_end(key)
+        while len(_QUERY_CACHE) > QUERY_CACHE_SIZE:
+            _QUERY_CACHE.popitem(last=False)
+    return result
 
 
 if __name__ == "__main__":
@@ -143,6 +615,19 @@ if __name__ == "__main__":
     logger.info("Starting MySQL MCP Server (transport=%s)", transport)
     if transport == "stdio":
         logger.info("Use with Claude Desktop: claude mcp add --transport stdio mysql-mcp -- python main.py")
+        warm_pool()
+        mcp.run(transport=transport)
     else:
         logger.info("HTTP server at http://%s:%s", BIND_HOST, BIND_PORT)
-    mcp.run(transport=transport)
+        try:
+            import uvloop  # noqa: F401
+        except ImportError:
+            logger.debug("uvloop not installed, using the default asyncio event loop")
+            backend_options = {}
+        else:
+            # anyio runs this loop on uvloop without changing the process-wide loop policy.
+            logger.debug("Using uvloop event loop")
+            backend_options = {"use_uvloop": True}
+        warm_pool()
+        serve = mcp.run_sse_async if transport == "sse" else mcp.run_streamable_http_async
+        anyio.run(serve, backend_options=backend_options)
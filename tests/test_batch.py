@@ -0,0 +1,114 @@
+import asyncio
+import os
+import sys
+from unittest import mock
+
+import pymysql
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+
+
+class _FakeCursor:
+    """Multi-statement cursor that returns the given result sets in order."""
+
+    def __init__(self, result_sets=(), error=None):
+        self._sets = list(result_sets)
+        self._error = error
+        self._rows = []
+        self.description = None
+
+    def execute(self, sql):
+        self.sql = sql
+        if not self._next() and self._error is not None:
+            raise self._error
+
+    def nextset(self):
+        if self._next():
+            return True
+        if self._error is not None:
+            raise self._error
+        return None
+
+    def _next(self):
+        if not self._sets:
+            return False
+        columns, self._rows = self._sets.pop(0)
+        self.description = [(column,) for column in columns]
+        return True
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+
+def _run_batch(queries, cursor):
+    released = []
+    alone = mock.Mock(side_effect=lambda query: ("alone:" + query, True))
+    with mock.patch.object(main, "get_connection", return_value=(object(), cursor)), \
+            mock.patch.object(main, "release_connection", lambda conn, discard=False: released.append(discard)), \
+            mock.patch.object(main, "_execute_query", alone):
+        results = main._execute_batch(queries)
+    return results, alone, released
+
+
+def test_batch_results_follow_query_order():
+    cursor = _FakeCursor([(["a"], [(1,)]), (["b"], [(2,)])])
+    results, alone, released = _run_batch(["SELECT 1 AS a", "SELECT 2 AS b"], cursor)
+    assert results == [
+        ('{"columns":["a"],"rows":[[1]]}', True),
+        ('{"columns":["b"],"rows":[[2]]}', True),
+    ]
+    assert cursor.sql == "SELECT 1 AS a\n;\nSELECT 2 AS b"
+    alone.assert_not_called()
+    assert released == [False]
+
+
+def test_batch_short_result_count_reruns_every_query_alone():
+    # "SELECT 1 /*" swallows the separator, so the server sees one statement: SELECT 1, 3.
+    queries = ["SELECT 1 /*", "SELECT 2 */, 3"]
+    cursor = _FakeCursor([(["1", "3"], [(1, 3)])])
+    results, alone, released = _run_batch(queries, cursor)
+    assert results == [("alone:SELECT 1 /*", True), ("alone:SELECT 2 */, 3", True)]
+    assert [call.args[0] for call in alone.call_args_list] == queries
+    assert released == [True]
+
+
+def test_batch_error_reruns_every_query_alone():
+    queries = ["SELECT 1", "SELEC 2", "SELECT 3"]
+    cursor = _FakeCursor([(["1"], [(1,)])], error=pymysql.err.ProgrammingError(1064, "syntax"))
+    results, alone, released = _run_batch(queries, cursor)
+    assert results == [("alone:" + query, True) for query in queries]
+    assert released == [True]
+
+
+def _route(query):
+    """Run run_query with batching on; returns "batch" or "alone" for where the query went."""
+    routes = []
+
+    async def run_db(fn, *args):
+        routes.append("alone")
+        return ("{}", True)
+
+    async def submit(statement):
+        routes.append("batch")
+        return ("{}", True)
+
+    batcher = mock.Mock(submit=submit)
+    with mock.patch.object(main, "QUERY_BATCH_SIZE", 2), \
+            mock.patch.object(main, "_run_db", run_db), \
+            mock.patch.object(main, "_get_batcher", return_value=batcher), \
+            mock.patch.object(main, "_QUERY_CACHE", main.OrderedDict()):
+        asyncio.run(main.run_query(query, no_cache=True))
+    return routes
+
+
+def test_plain_select_is_batched():
+    assert _route("SELECT 1") == ["batch"]
+
+
+@pytest.mark.parametrize("query", ["SELECT @a := 5", "SELECT 1 INTO @a", "SELECT GET_LOCK('k', 0)"])
+def test_session_state_select_runs_alone(query):
+    assert _route(query) == ["alone"]
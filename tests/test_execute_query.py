@@ -0,0 +1,112 @@
+import os
+import sys
+from types import SimpleNamespace
+from unittest import mock
+
+import pymysql
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+
+
+class _FakeCursor:
+    """Cursor returning one result set (or none), optionally failing in execute or fetch."""
+
+    def __init__(self, conn, rows=None, execute_error=None, fetch_error=None):
+        self._conn = conn
+        self._rows = rows
+        self._execute_error = execute_error
+        self._fetch_error = fetch_error
+        self.description = None
+
+    def execute(self, sql):
+        if self._execute_error is not None:
+            raise self._execute_error
+        if self._rows is not None:
+            self.description = [("c",)]
+            self._conn._result = SimpleNamespace(unbuffered_active=True)
+
+    def fetchmany(self, size):
+        if self._fetch_error is not None:
+            raise self._fetch_error
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        if not rows:
+            self._conn._result.unbuffered_active = False
+        return rows
+
+
+def _run_query(query, **cursor_kwargs):
+    """Run _execute_query on a fake connection; returns (result or exception, discard)."""
+    conn = SimpleNamespace(_result=None)
+    cursor = _FakeCursor(conn, **cursor_kwargs)
+    released = []
+    with mock.patch.object(main, "get_connection", return_value=(conn, cursor)), \
+            mock.patch.object(main, "release_connection", lambda conn, discard=False: released.append(discard)):
+        try:
+            result = main._execute_query(query)
+        except Exception as e:
+            result = e
+    assert len(released) == 1
+    return result, released[0]
+
+
+def test_result_set_query_keeps_connection():
+    result, discard = _run_query("SELECT 1", rows=[(1,)])
+    assert result == ('{"columns":["c"],"rows":[[1]]}', True)
+    assert discard is False
+
+
+def test_query_without_result_set_discards_connection():
+    result, discard = _run_query("SET @x = 5")
+    assert result[1] is False
+    assert discard is True
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT @x := 5",
+    "SELECT 1 INTO @x",
+    "SELECT GET_LOCK('k', 0)",
+    "/* note */ CALL p()",
+])
+def test_session_state_query_discards_connection(query):
+    _, discard = _run_query(query, rows=[(1,)])
+    assert discard is True
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT @@version",
+    "SELECT * FROM users WHERE email LIKE '%@example.com'",
+])
+def test_read_only_at_sign_keeps_connection(query):
+    _, discard = _run_query(query, rows=[(1,)])
+    assert discard is False
+
+
+def test_programming_error_keeps_connection():
+    error = pymysql.err.ProgrammingError(1064, "syntax")
+    result, discard = _run_query("SELEC 1", execute_error=error)
+    assert result is error
+    assert discard is False
+
+
+def test_operational_error_discards_connection():
+    error = pymysql.err.OperationalError(2013, "Lost connection")
+    result, discard = _run_query("SELECT 1", execute_error=error)
+    assert result is error
+    assert discard is True
+
+
+def test_error_with_half_read_result_discards_connection():
+    error = pymysql.err.InternalError(1317, "interrupted")
+    result, discard = _run_query("SELECT 1", rows=[(1,)], fetch_error=error)
+    assert result is error
+    assert discard is True
+
+
+def test_non_mysql_error_discards_connection():
+    error = RuntimeError("boom")
+    result, discard = _run_query("SELECT 1", execute_error=error)
+    assert result is error
+    assert discard is True
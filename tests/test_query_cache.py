@@ -0,0 +1,39 @@
+import asyncio
+import os
+import sys
+from collections import OrderedDict
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+
+
+def _executions(query, calls=2):
+    """Run run_query `calls` times; returns how many reached the database."""
+    executed = []
+
+    async def run_db(fn, *args):
+        executed.append(args)
+        return ("{}", True)
+
+    async def run_all():
+        for _ in range(calls):
+            await main.run_query(query)
+
+    with mock.patch.object(main, "QUERY_BATCH_SIZE", 1), \
+            mock.patch.object(main, "_run_db", run_db), \
+            mock.patch.object(main, "_QUERY_CACHE", OrderedDict()):
+        asyncio.run(run_all())
+    return len(executed)
+
+
+def test_repeated_select_is_cached():
+    assert _executions("SELECT 1") == 1
+
+
+@pytest.mark.parametrize("query", ["SELECT GET_LOCK('job', 0)", "SELECT @x := 5"])
+def test_session_state_select_is_not_cached(query):
+    assert _executions(query) == 2